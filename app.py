@@ -9,149 +9,18 @@ import time
 import json
 import numpy as np
 
+from sepa import (
+    TIMEFRAME_CRITERIA,
+    apply_timeframe_criteria,
+    check_sepa_conditions,
+    get_us_midsmall_cap_stocks,
+    load_adjusted_history,
+)
+
 # 페이지 기본 설정
 st.set_page_config(page_title="SEPA Strategy Dashboard", page_icon="📈", layout="wide")
 
 
-def get_us_midsmall_cap_stocks():
-    """
-    Russell 2000 및 Midcap 주식들의 티커 목록을 가져옵니다.
-    """
-    try:
-        # Russell 2000 대표 종목들 (시가총액 상위)
-        russell2000_tickers = [
-            # 산업재
-            "GTLS",
-            "KRNT",
-            "NDSN",
-            "AGCO",
-            "GGG",
-            "MIDD",
-            "RS",
-            "RBC",
-            "ATKR",
-            # 정보기술
-            "NSIT",
-            "SMCI",
-            "ANET",
-            "BL",
-            "POWI",
-            "QLYS",
-            "HLIT",
-            "LFUS",
-            # 금융
-            "EWBC",
-            "FCNCA",
-            "UBSI",
-            "WRLD",
-            "CATY",
-            "HOPE",
-            "BANF",
-            "FFIN",
-            # 의료/바이오
-            "OMCL",
-            "MMSI",
-            "NEOG",
-            "SRPT",
-            "PDCO",
-            "GMED",
-            "HAE",
-            "ACAD",
-            # 소비재
-            "DECK",
-            "BOOT",
-            "FOXF",
-            "HELE",
-            "JACK",
-            "WING",
-            "DORM",
-            "MSGS",
-            # 에너지
-            "SM",
-            "MUR",
-            "CNX",
-            "CIVI",
-            "PBF",
-            "TRGP",
-            # 부동산
-            "CSR",
-            "EXR",
-            "MAA",
-            "AIV",
-            "UDR",
-        ]
-
-        # Russell Midcap 대표 종목들 (시가총액 상위)
-        russellmid_tickers = [
-            # 정보기술
-            "EPAM",
-            "PAYC",
-            "FSLR",
-            "BR",
-            "ZBRA",
-            "TYL",
-            "CTLT",
-            "WEX",
-            # 산업재
-            "PWR",
-            "XYL",
-            "RHI",
-            "JBHT",
-            "CHRW",
-            "EXPO",
-            "TREX",
-            "GLNG",
-            # 금융
-            "CINF",
-            "AJG",
-            "FNF",
-            "FAF",
-            "AIZ",
-            "WRB",
-            "RJF",
-            "SEIC",
-            # 의료/바이오
-            "PODD",
-            "TECH",
-            "DXCM",
-            "ALGN",
-            "HOLX",
-            "CRL",
-            "HSIC",
-            "EHC",
-            # 소비재
-            "GRMN",
-            "DLTR",
-            "DPZ",
-            "CPRI",
-            "TPR",
-            "POOL",
-            "DRI",
-            "FIVE",
-            # 에너지
-            "DVN",
-            "MRO",
-            "EQT",
-            "AR",
-            "RRC",
-            "MGY",
-            # 부동산
-            "MPW",
-            "DEI",
-            "VTR",
-            "HR",
-            "HIW",
-        ]
-
-        # 두 리스트 합치기
-        all_tickers = list(set(russell2000_tickers + russellmid_tickers))
-        return all_tickers
-
-    except Exception as e:
-        st.error(f"종목 리스트 가져오기 실패: {str(e)}")
-        return []
-
-
 @st.cache_data(ttl=3600)  # 1시간 캐시
 def calculate_technical_indicators(df):
     """기술적 지표를 계산합니다."""
@@ -169,44 +38,12 @@ def calculate_technical_indicators(df):
         return None
 
 
-def check_sepa_conditions(df):
-    """SEPA 전략 조건을 확인합니다."""
-    if df is None or len(df) < 200:
-        return False, {}
-
-    try:
-        latest = df.iloc[-1]
-        month_ago = df.iloc[-30]
-
-        # SEPA 조건 체크
-        criteria = {
-            "현재가가 200일선 위": latest["Close"] > latest["MA200"],
-            "150일선이 200일선 위": latest["MA150"] > latest["MA200"],
-            "50일선이 150/200일선 위": (latest["MA50"] > latest["MA150"])
-            and (latest["MA50"] > latest["MA200"]),
-            "현재가가 5일선 위": latest["Close"] > latest["MA5"],
-            "200일선 상승 추세": latest["MA200"] > month_ago["MA200"],
-        }
-
-        # 52주 최저가 대비 상승률 계산
-        year_low = df["Low"].tail(252).min()
-        price_above_low = (latest["Close"] / year_low - 1) > 0.3
-        criteria["52주 최저가 대비 30% 이상"] = price_above_low
-
-        all_conditions_met = all(criteria.values())
-
-        return all_conditions_met, criteria
-
-    except Exception as e:
-        st.error(f"SEPA 조건 체크 중 오류 발생: {str(e)}")
-        return False, {}
-
-
-def analyze_stock(ticker):
+def analyze_stock(ticker, use_timeframes=False):
     """개별 주식을 분석합니다."""
     try:
         stock = yf.Ticker(ticker)
-        df = stock.history(period="max")
+        daily = load_adjusted_history(ticker)
+        df = daily
         if len(df) > 252:  # 1년치 데이터만 사용
             df = df.tail(252)
 
@@ -232,6 +69,9 @@ def analyze_stock(ticker):
                 "criteria_details": criteria,
                 "차트데이터": df,
             }
+            if use_timeframes:
+                # 주봉/월봉은 통과 종목을 모은 뒤 apply_timeframe_criteria에서 한 번에 계산
+                result["일봉"] = daily
             return result
 
         return None
@@ -313,6 +153,10 @@ def main():
     st.title("SEPA Strategy Dashboard 📈")
     st.markdown("---")
 
+    use_timeframes = st.checkbox(
+        "주봉 조건 함께 확인", help=", ".join(TIMEFRAME_CRITERIA.keys())
+    )
+
     # 분석 시작 버튼
     if not st.session_state.analysis_done and st.button("분석 시작"):
         # 분석 시작 시간 기록
@@ -332,7 +176,8 @@ def main():
         progress_bar = st.progress(0)
         with ThreadPoolExecutor(max_workers=10) as executor:
             future_to_stock = {
-                executor.submit(analyze_stock, ticker): ticker for ticker in tickers
+                executor.submit(analyze_stock, ticker, use_timeframes): ticker
+                for ticker in tickers
             }
 
             completed = 0
@@ -343,6 +188,10 @@ def main():
                 completed += 1
                 progress_bar.progress(completed / len(tickers))
 
+        if use_timeframes:
+            # 이미 받은 일봉에서 주봉/월봉을 만들어 추가 다운로드 없이 확인
+            sepa_stocks = apply_timeframe_criteria(sepa_stocks)
+
         # 결과를 데이터프레임으로 변환
         if sepa_stocks:
             st.session_state.df_results = pd.DataFrame(sepa_stocks)
@@ -0,0 +1,542 @@
+import os
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+def get_us_midsmall_cap_stocks():
+    """
+    Russell 2000 및 Midcap 주식들의 티커 목록을 가져옵니다.
+    """
+    # Russell 2000 대표 종목들 (시가총액 상위)
+    russell2000_tickers = [
+        # 산업재
+        "GTLS",
+        "KRNT",
+        "NDSN",
+        "AGCO",
+        "GGG",
+        "MIDD",
+        "RS",
+        "RBC",
+        "ATKR",
+        # 정보기술
+        "NSIT",
+        "SMCI",
+        "ANET",
+        "BL",
+        "POWI",
+        "QLYS",
+        "HLIT",
+        "LFUS",
+        # 금융
+        "EWBC",
+        "FCNCA",
+        "UBSI",
+        "WRLD",
+        "CATY",
+        "HOPE",
+        "BANF",
+        "FFIN",
+        # 의료/바이오
+        "OMCL",
+        "MMSI",
+        "NEOG",
+        "SRPT",
+        "PDCO",
+        "GMED",
+        "HAE",
+        "ACAD",
+        # 소비재
+        "DECK",
+        "BOOT",
+        "FOXF",
+        "HELE",
+        "JACK",
+        "WING",
+        "DORM",
+        "MSGS",
+        # 에너지
+        "SM",
+        "MUR",
+        "CNX",
+        "CIVI",
+        "PBF",
+        "TRGP",
+        # 부동산
+        "CSR",
+        "EXR",
+        "MAA",
+        "AIV",
+        "UDR",
+    ]
+
+    # Russell Midcap 대표 종목들 (시가총액 상위)
+    russellmid_tickers = [
+        # 정보기술
+        "EPAM",
+        "PAYC",
+        "FSLR",
+        "BR",
+        "ZBRA",
+        "TYL",
+        "CTLT",
+        "WEX",
+        # 산업재
+        "PWR",
+        "XYL",
+        "RHI",
+        "JBHT",
+        "CHRW",
+        "EXPO",
+        "TREX",
+        "GLNG",
+        # 금융
+        "CINF",
+        "AJG",
+        "FNF",
+        "FAF",
+        "AIZ",
+        "WRB",
+        "RJF",
+        "SEIC",
+        # 의료/바이오
+        "PODD",
+        "TECH",
+        "DXCM",
+        "ALGN",
+        "HOLX",
+        "CRL",
+        "HSIC",
+        "EHC",
+        # 소비재
+        "GRMN",
+        "DLTR",
+        "DPZ",
+        "CPRI",
+        "TPR",
+        "POOL",
+        "DRI",
+        "FIVE",
+        # 에너지
+        "DVN",
+        "MRO",
+        "EQT",
+        "AR",
+        "RRC",
+        "MGY",
+        # 부동산
+        "MPW",
+        "DEI",
+        "VTR",
+        "HR",
+        "HIW",
+    ]
+
+    # 두 리스트 합치기
+    all_tickers = list(set(russell2000_tickers + russellmid_tickers))
+    return all_tickers
+
+
+# 일봉 데이터에서 파생할 수 있는 타임프레임 (None은 일봉 그대로 사용)
+TIMEFRAMES = {"D": None, "W": "W-FRI", "M": "M"}
+
+OHLCV_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
+
+# 타임프레임별 추가 조건: 조건명 -> (타임프레임, 왼쪽 지표, 오른쪽 지표)
+# 최신 봉 기준으로 왼쪽 지표가 오른쪽 지표보다 클 때 충족
+TIMEFRAME_CRITERIA = {
+    "주봉 10주선이 30주선 위": ("W", "MA10", "MA30"),
+    "주봉 종가가 10주선 위": ("W", "Close", "MA10"),
+}
+
+
+def _period_keys(index, timeframe):
+    """날짜 인덱스를 타임프레임 구간 키로 변환합니다."""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_period(TIMEFRAMES[timeframe])
+
+
+def resample_universe(daily_store, timeframe):
+    """여러 종목의 일봉을 한 번의 groupby로 주봉/월봉으로 변환합니다.
+
+    daily_store는 {티커: 일봉 DataFrame} 형태이며,
+    (티커, 날짜) MultiIndex를 가진 DataFrame을 반환합니다.
+    각 봉의 날짜는 해당 구간의 마지막 거래일입니다.
+    """
+    if not daily_store:
+        return pd.DataFrame(columns=list(OHLCV_AGG))
+
+    panel = pd.concat(
+        {ticker: df[list(OHLCV_AGG)] for ticker, df in daily_store.items()},
+        names=["Ticker", "Date"],
+    )
+    if TIMEFRAMES[timeframe] is None:
+        return panel
+
+    dates = panel.index.get_level_values("Date")
+    keys = [panel.index.get_level_values("Ticker"), _period_keys(dates, timeframe)]
+    bars = panel.groupby(keys).agg(OHLCV_AGG)
+    last_dates = pd.Series(dates, index=panel.index).groupby(keys).max()
+    bars.index = pd.MultiIndex.from_arrays(
+        [bars.index.get_level_values(0), pd.DatetimeIndex(last_dates)],
+        names=["Ticker", "Date"],
+    )
+    return bars
+
+
+class ResampleCache:
+    """종목/타임프레임별 변환 결과를 저장하고 새 일봉만 반영합니다."""
+
+    def __init__(self):
+        self._bars = {}
+
+    def _reusable_start(self, ticker, daily_df, timeframe):
+        """캐시를 이어 쓸 수 있으면 다시 계산할 시작일을, 아니면 None을 반환합니다."""
+        first_date, cached = self._bars.get((ticker, timeframe), (None, None))
+        if (
+            cached is None
+            or len(cached) < 2
+            or daily_df.index[0] != first_date
+            or cached.index[-1] not in daily_df.index
+        ):
+            return None
+
+        # 분할/배당으로 과거 가격이 다시 계산되었으면 마지막 완성 봉의 종가가 달라짐
+        closed = cached.index[-2]
+        if closed not in daily_df.index or not np.isclose(
+            daily_df.at[closed, "Close"], cached.at[closed, "Close"]
+        ):
+            return None
+
+        # 마지막(미완성일 수 있는) 구간부터 다시 계산
+        last_period = _period_keys(cached.index[-1:], timeframe)[0]
+        in_tail = _period_keys(daily_df.index, timeframe) >= last_period
+        return daily_df.index[in_tail][0]
+
+    def get_many(self, daily_store, timeframe):
+        """여러 종목의 새 일봉을 한 번의 groupby로 반영해 {티커: 봉}을 반환합니다."""
+        if TIMEFRAMES[timeframe] is None:
+            return dict(daily_store)
+
+        heads, tails = {}, {}
+        for ticker, daily_df in daily_store.items():
+            if daily_df.empty:
+                continue
+            start = self._reusable_start(ticker, daily_df, timeframe)
+            if start is None:
+                tails[ticker] = daily_df
+            else:
+                _, cached = self._bars[(ticker, timeframe)]
+                heads[ticker] = cached[cached.index < start]
+                tails[ticker] = daily_df.loc[start:]
+
+        results = {}
+        if not tails:
+            return results
+
+        panel = resample_universe(tails, timeframe)
+        for ticker, tail in panel.groupby(level="Ticker"):
+            bars = tail.droplevel("Ticker")
+            if ticker in heads:
+                bars = pd.concat([heads[ticker], bars])
+            self._bars[(ticker, timeframe)] = (daily_store[ticker].index[0], bars)
+            results[ticker] = bars
+        return results
+
+    def invalidate(self, ticker):
+        """종목의 모든 타임프레임 캐시를 삭제합니다."""
+        for key in [key for key in self._bars if key[0] == ticker]:
+            del self._bars[key]
+
+
+_resample_cache = ResampleCache()
+
+
+def get_resample_cache():
+    """프로세스 전체에서 공유되는 타임프레임 변환 캐시를 반환합니다."""
+    return _resample_cache
+
+
+def add_moving_averages(df, windows):
+    """지정한 기간의 이동평균선을 추가합니다."""
+    df = df.copy()
+    for window in windows:
+        df[f"MA{window}"] = df["Close"].rolling(window=window).mean()
+    return df
+
+
+def build_timeframes(daily_store, criteria=None):
+    """조건에 필요한 타임프레임 데이터를 여러 종목의 일봉에서 한 번에 만듭니다.
+
+    {티커: {타임프레임: DataFrame}} 형태로 반환합니다.
+    """
+    criteria = TIMEFRAME_CRITERIA if criteria is None else criteria
+    windows = {}
+    for timeframe, left, right in criteria.values():
+        for column in (left, right):
+            if column.startswith("MA"):
+                windows.setdefault(timeframe, set()).add(int(column[2:]))
+
+    cache = get_resample_cache()
+    frames = {ticker: {} for ticker in daily_store}
+    for timeframe in {spec[0] for spec in criteria.values()}:
+        for ticker, bars in cache.get_many(daily_store, timeframe).items():
+            frames[ticker][timeframe] = add_moving_averages(
+                bars, sorted(windows.get(timeframe, ()))
+            )
+    return frames
+
+
+def check_timeframe_conditions(frames, criteria=None):
+    """타임프레임별 추가 조건을 확인합니다."""
+    criteria = TIMEFRAME_CRITERIA if criteria is None else criteria
+    results = {}
+    for name, (timeframe, left, right) in criteria.items():
+        if timeframe not in frames:
+            results[name] = False
+            continue
+        latest = frames[timeframe].iloc[-1]
+        # 기간이 부족해 지표가 NaN이면 비교 결과는 False
+        results[name] = bool(latest[left] > latest[right])
+    return results
+
+
+def apply_timeframe_criteria(results, criteria=None):
+    """일봉 조건을 통과한 종목들에 타임프레임 조건을 한 번에 적용합니다."""
+    daily_store = {result["티커"]: result.pop("일봉") for result in results}
+    frames = build_timeframes(daily_store, criteria)
+
+    passed = []
+    for result in results:
+        timeframe_criteria = check_timeframe_conditions(
+            frames[result["티커"]], criteria
+        )
+        result["criteria_details"].update(timeframe_criteria)
+        if all(timeframe_criteria.values()):
+            passed.append(result)
+    return passed
+
+
+def sepa_criteria(close, ma5, ma50, ma150, ma200, ma200_month_ago, year_low):
+    """SEPA 조건별 충족 여부를 계산합니다.
+
+    값 하나씩 넘기거나, 여러 종목을 담은 numpy 배열을 한 번에 넘길 수 있습니다.
+    """
+    return {
+        "현재가가 200일선 위": close > ma200,
+        "150일선이 200일선 위": ma150 > ma200,
+        "50일선이 150/200일선 위": (ma50 > ma150) & (ma50 > ma200),
+        "현재가가 5일선 위": close > ma5,
+        "200일선 상승 추세": ma200 > ma200_month_ago,
+        # 52주 최저가 대비 상승률
+        "52주 최저가 대비 30% 이상": (close / year_low - 1) > 0.3,
+    }
+
+
+def check_sepa_conditions(df):
+    """SEPA 전략 조건을 확인합니다.
+
+    계산 중 오류는 호출한 쪽에서 처리하도록 그대로 전달합니다.
+    """
+    if df is None or len(df) < 200:
+        return False, {}
+
+    latest = df.iloc[-1]
+    month_ago = df.iloc[-30]
+
+    # SEPA 조건 체크
+    criteria = sepa_criteria(
+        latest["Close"],
+        latest["MA5"],
+        latest["MA50"],
+        latest["MA150"],
+        latest["MA200"],
+        month_ago["MA200"],
+        df["Low"].tail(252).min(),
+    )
+
+    all_conditions_met = all(criteria.values())
+
+    return all_conditions_met, criteria
+
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+
+# 원시 일봉/기업 이벤트 저장 폴더 (None이면 메모리에만 저장)
+PRICE_STORE_DIR = "price_store"
+
+
+def _reverse_cumprod(steps):
+    """각 날짜 '이후'에 발생한 이벤트 계수의 누적곱을 계산합니다.
+
+    (티커, 날짜) 순으로 정렬된 MultiIndex면 종목별로 따로 계산합니다.
+    """
+    if isinstance(steps.index, pd.MultiIndex):
+        # 자기 자신을 포함한 누적곱을 자기 계수로 나누면 '이후' 누적곱
+        return steps[::-1].groupby(level=0).cumprod()[::-1] / steps
+    return steps[::-1].cumprod()[::-1].shift(-1, fill_value=1.0)
+
+
+def split_history(history):
+    """yfinance 비조정 데이터를 원시 일봉과 기업 이벤트로 분리합니다.
+
+    Yahoo의 비조정 가격에도 주식 분할은 이미 반영되어 있으므로,
+    받은 구간 안의 분할 비율로 되돌려 실제 거래 가격을 만듭니다.
+    여러 종목을 (티커, 날짜) MultiIndex로 쌓은 데이터도 한 번에 처리합니다.
+    """
+    actions = history.reindex(columns=ACTION_COLUMNS).fillna(0.0)
+    later_splits = _reverse_cumprod(actions["Stock Splits"].replace(0, 1.0))
+    # 배당금도 분할이 반영된 값이므로 가격과 같은 주당 단위로 되돌림
+    actions["Dividends"] = actions["Dividends"] * later_splits
+    events = actions[(actions != 0).any(axis=1)]
+
+    bars = history[PRICE_COLUMNS + ["Volume"]].astype(float)
+    bars[PRICE_COLUMNS] = bars[PRICE_COLUMNS].mul(later_splits, axis=0)
+    bars["Volume"] = bars["Volume"].div(later_splits)
+    return bars, events
+
+
+def adjustment_factors(bars, events):
+    """원시 일봉에 곱할 (가격, 거래량) 누적 조정 계수를 계산합니다."""
+    events = events.reindex(bars.index, fill_value=0.0)
+    splits = events["Stock Splits"].replace(0, 1.0)
+    # 배당락일 전날 종가 기준으로 배당만큼 과거 가격을 낮춤
+    dividends = (1 - events["Dividends"] / bars["Close"].shift(1)).fillna(1.0)
+
+    price = _reverse_cumprod(dividends / splits)
+    volume = _reverse_cumprod(splits)
+    return price, volume
+
+
+def adjust_prices(bars, events):
+    """원시 일봉에 분할/배당 조정을 적용합니다."""
+    price, volume = adjustment_factors(bars, events)
+    adjusted = bars.copy()
+    adjusted[PRICE_COLUMNS] = bars[PRICE_COLUMNS].mul(price, axis=0)
+    adjusted["Volume"] = bars["Volume"].mul(volume)
+    return adjusted
+
+
+class PriceStore:
+    """종목별 원시 일봉과 기업 이벤트를 따로 저장합니다."""
+
+    def __init__(self, directory=PRICE_STORE_DIR):
+        self.directory = directory
+        self._bars = {}
+        self._events = {}
+
+    def _path(self, ticker, kind):
+        return os.path.join(self.directory, f"{ticker}_{kind}.pkl")
+
+    def _read(self, cache, ticker, kind):
+        if (
+            ticker not in cache
+            and self.directory
+            and os.path.exists(self._path(ticker, kind))
+        ):
+            cache[ticker] = pd.read_pickle(self._path(ticker, kind))
+        return cache.get(ticker)
+
+    def _load(self, ticker):
+        return (
+            self._read(self._bars, ticker, "bars"),
+            self._read(self._events, ticker, "events"),
+        )
+
+    def _save(self, ticker):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._bars[ticker].to_pickle(self._path(ticker, "bars"))
+        self._events[ticker].to_pickle(self._path(ticker, "events"))
+
+    def has_new_events(self, ticker, events):
+        """저장되지 않은 분할/배당이 events에 있으면 True를 반환합니다."""
+        stored = self._read(self._events, ticker, "events")
+        if stored is None:
+            return not events.empty
+        known = stored.reindex(events.index)
+        return not np.allclose(known.values, events.values)
+
+    def ingest(self, ticker, history):
+        """받은 데이터를 병합하고, 과거 조정값이 바뀌었으면 True를 반환합니다.
+
+        저장된 마지막 봉과 겹치지 않는 구간은 중간이 비게 되므로 받지 않습니다.
+        """
+        new_bars, new_events = split_history(history)
+        bars, events = self._load(ticker)
+
+        if bars is None:
+            changed = True
+        else:
+            if new_bars.index[0] > bars.index[-1]:
+                raise ValueError(
+                    f"{ticker}: 받은 구간({new_bars.index[0]:%Y-%m-%d}~)이 "
+                    f"저장된 마지막 봉({bars.index[-1]:%Y-%m-%d})과 겹치지 않습니다."
+                )
+            changed = self.has_new_events(ticker, new_events)
+            # 겹치는 구간은 새 데이터로 덮어씀 (장중 미완성 봉 갱신)
+            bars = bars[bars.index < new_bars.index[0]]
+            new_bars = pd.concat([bars, new_bars])
+            events = events[~events.index.isin(new_events.index)]
+            new_events = pd.concat([events, new_events]).sort_index()
+
+        self._bars[ticker] = new_bars
+        self._events[ticker] = new_events
+        self._save(ticker)
+        return changed
+
+    def refresh(self, ticker):
+        """마지막 저장일 이후 데이터만 받아 갱신합니다."""
+        bars, _ = self._load(ticker)
+        stock = yf.Ticker(ticker)
+        if bars is None or bars.empty:
+            history = stock.history(period="max", auto_adjust=False, actions=True)
+        else:
+            history = stock.history(
+                start=bars.index[-1].strftime("%Y-%m-%d"),
+                auto_adjust=False,
+                actions=True,
+            )
+
+        if history.empty:
+            return False
+        return self.ingest(ticker, history)
+
+    def adjusted(self, ticker):
+        """저장된 원시 일봉에 조정 계수를 적용해 반환합니다."""
+        bars, events = self._load(ticker)
+        if bars is None:
+            return pd.DataFrame(columns=PRICE_COLUMNS + ["Volume"])
+        return adjust_prices(bars, events)
+
+    def release(self, ticker):
+        """디스크에 저장된 종목의 일봉을 메모리에서 내립니다 (이벤트는 유지)."""
+        if self.directory:
+            self._bars.pop(ticker, None)
+
+
+_price_store = PriceStore()
+
+
+def get_price_store():
+    """프로세스 전체에서 공유되는 원시 가격 저장소를 반환합니다."""
+    return _price_store
+
+
+def load_adjusted_history(ticker):
+    """저장소를 증분 갱신한 뒤 조정 일봉을 반환합니다."""
+    if get_price_store().refresh(ticker):
+        # 새 분할/배당이 있으면 이 종목의 파생 데이터만 다시 계산
+        get_resample_cache().invalidate(ticker)
+    return get_price_store().adjusted(ticker)
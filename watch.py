@@ -0,0 +1,314 @@
+import argparse
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+
+from sepa import (
+    PRICE_COLUMNS,
+    get_price_store,
+    get_us_midsmall_cap_stocks,
+    load_adjusted_history,
+    sepa_criteria,
+    split_history,
+)
+
+OHLCV_COLUMNS = PRICE_COLUMNS + ["Volume"]
+STATE_BARS = 252  # 종목별로 메모리에 유지할 일봉 수 (1년치)
+POLL_BATCH = 200  # 한 번에 요청할 종목 수
+
+
+class FileSink:
+    """전환 이벤트를 JSON Lines 파일에 추가합니다."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, event):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+class WebhookSink:
+    """전환 이벤트를 웹훅 URL로 전송합니다."""
+
+    def __init__(self, url):
+        self.url = url
+
+    def emit(self, event):
+        try:
+            requests.post(self.url, json=event, timeout=5)
+        except requests.RequestException as e:
+            print(f"웹훅 전송 실패 ({event['ticker']}): {str(e)}")
+
+
+def moving_average(closes, window, offset=0):
+    """종목별 종가 배열에서 끝에서 offset개 앞 봉 기준 이동평균을 계산합니다.
+
+    기간 안에 빈 값(NaN)이 있으면 결과도 NaN이 되어 조건은 충족되지 않습니다.
+    """
+    end = closes.shape[1] - offset
+    return closes[:, end - window : end].mean(axis=1)
+
+
+class SEPAWatcher:
+    """관심 종목의 SEPA 조건 충족 여부를 주기적으로 확인합니다.
+
+    종목별 최근 1년치 종가/저가를 (종목 수, STATE_BARS) numpy 배열로 보관하고,
+    한 배치의 갱신과 조건 확인을 배열 연산 한 번으로 처리합니다.
+    """
+
+    def __init__(self, tickers, sinks):
+        self.tickers = tickers
+        self.sinks = sinks
+
+    def _set_row(self, i, daily):
+        """조정 일봉으로 i번째 종목의 상태를 채웁니다."""
+        tail = daily.tail(STATE_BARS)
+        self.closes[i] = np.nan
+        self.lows[i] = np.nan
+        self.closes[i, -len(tail) :] = tail["Close"].to_numpy()
+        self.lows[i, -len(tail) :] = tail["Low"].to_numpy()
+        # 마지막 이벤트 이후 봉은 조정 계수가 1이므로 원시 봉과 그대로 비교 가능
+        self.last_date[i] = tail.index[-1].value
+        self.last_bar[i] = tail[OHLCV_COLUMNS].iloc[-1].to_numpy(dtype=float)
+
+    def _evaluate(self, rows):
+        """여러 종목의 SEPA 조건 충족 여부를 한 번에 계산합니다."""
+        closes = self.closes[rows]
+        criteria = sepa_criteria(
+            closes[:, -1],
+            moving_average(closes, 5),
+            moving_average(closes, 50),
+            moving_average(closes, 150),
+            moving_average(closes, 200),
+            # check_sepa_conditions의 df.iloc[-30] 시점 200일선
+            moving_average(closes, 200, offset=29),
+            np.nanmin(self.lows[rows], axis=1),
+        )
+        return np.logical_and.reduce(list(criteria.values()))
+
+    def bootstrap(self):
+        """전체 이력을 한 번 불러와 초기 상태를 만듭니다."""
+
+        def load(ticker):
+            try:
+                return ticker, load_adjusted_history(ticker)
+            except Exception as e:
+                print(f"{ticker} 로드 중 오류 발생: {str(e)}")
+                return ticker, None
+
+        store = get_price_store()
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            loaded = {
+                ticker: daily
+                for ticker, daily in executor.map(load, self.tickers)
+                if daily is not None and len(daily) >= 200
+            }
+
+        self.index = pd.Index(list(loaded))
+        self.closes = np.full((len(self.index), STATE_BARS), np.nan)
+        self.lows = np.full((len(self.index), STATE_BARS), np.nan)
+        self.last_date = np.zeros(len(self.index), dtype=np.int64)
+        self.last_bar = np.zeros((len(self.index), len(OHLCV_COLUMNS)))
+        self.tz = None
+        for i, (ticker, daily) in enumerate(loaded.items()):
+            self._set_row(i, daily)
+            self.tz = daily.index.tz
+            # 이후에는 최근 1년치 상태만 메모리에 유지
+            store.release(ticker)
+        self.status = self._evaluate(np.arange(len(self.index)))
+
+    def _poll_latest(self, tickers):
+        """최근 며칠치 일봉을 여러 종목 한 번에 받아 (티커, 날짜) 순으로 쌓습니다."""
+        data = yf.download(
+            tickers,
+            period="5d",
+            auto_adjust=False,
+            actions=True,
+            group_by="ticker",
+            ignore_tz=False,  # Ticker.history와 같은 시간대 인덱스 유지
+            threads=True,
+            progress=False,
+        )
+        if not isinstance(data.columns, pd.MultiIndex):
+            data = pd.concat({tickers[0]: data}, axis=1)
+
+        history = data.stack(level=0).swaplevel().sort_index()
+        history.index.names = ["Ticker", "Date"]
+        return history.dropna(subset=["Close"])
+
+    def _rebuild(self, i, ticker):
+        """저장소의 전체 이력으로 종목 상태를 다시 만듭니다."""
+        store = get_price_store()
+        self._set_row(i, store.adjusted(ticker))
+        store.release(ticker)
+
+    def _apply_batch(self, history):
+        """한 배치의 새 봉을 반영하고 다시 확인할 종목 행 번호를 반환합니다."""
+        bars, actions = split_history(history)
+        rows = self.index.get_indexer(bars.index.get_level_values("Ticker"))
+        bars, rows = bars[rows >= 0], rows[rows >= 0]
+        if not len(rows):
+            return rows
+
+        dates = bars.index.get_level_values("Date").asi8
+        last_date = self.last_date[rows]
+        values = bars[OHLCV_COLUMNS].to_numpy(dtype=float)
+
+        # 종목별 마지막 봉을 보관 중인 마지막 봉과 한 번에 비교
+        is_last = np.append(rows[1:] != rows[:-1], True)
+        is_first = np.insert(rows[1:] != rows[:-1], 0, True)
+        new_day = dates[is_last] > last_date[is_last]
+        changed = new_day | (
+            (dates[is_last] == last_date[is_last])
+            & (values[is_last] != self.last_bar[rows[is_last]]).any(axis=1)
+        )
+        if not changed.any():
+            return rows[:0]
+
+        # 구간이 끊겼거나 새 분할/배당이 있는 종목만 종목별로 다시 만듦
+        changed_rows = rows[is_last][changed]
+        gap_rows = set(rows[is_first][dates[is_first] > last_date[is_first]])
+        store = get_price_store()
+        rebuilt, failed = [], set()
+        for i in changed_rows:
+            ticker = self.index[i]
+            try:
+                if i in gap_rows:
+                    # 빈 구간은 저장소의 마지막 봉부터 다시 받아 채움
+                    store.refresh(ticker)
+                elif ticker in actions.index and store.has_new_events(
+                    ticker, actions.xs(ticker, level="Ticker")
+                ):
+                    # 새 분할/배당: 과거 조정값이 바뀌므로 이 종목만 전체 재계산
+                    store.ingest(ticker, history.xs(ticker, level="Ticker"))
+                else:
+                    continue
+                self._rebuild(i, ticker)
+                rebuilt.append(i)
+            except Exception as e:
+                print(f"{ticker} 갱신 중 오류 발생: {str(e)}")
+                failed.add(i)  # 빠른 갱신과 재확인에서 모두 제외
+
+        skipped = failed.union(rebuilt)
+        fast_rows = np.array([i for i in changed_rows if i not in skipped], dtype=int)
+
+        # 새 거래일이 시작된 종목만 하루 한 번 저장소에 병합해 직전 봉을 확정
+        for i in rows[is_last][changed & new_day]:
+            if i in skipped:
+                continue
+            ticker = self.index[i]
+            try:
+                store.ingest(ticker, history.xs(ticker, level="Ticker"))
+                store.release(ticker)
+            except Exception as e:
+                print(f"{ticker} 저장 중 오류 발생: {str(e)}")
+
+        # 보관 중인 마지막 봉 이후의 봉을 배열 끝에 한 번에 기록
+        fast = np.isin(rows, fast_rows) & (dates >= last_date)
+        shift = np.zeros(len(self.index), dtype=int)
+        np.add.at(shift, rows[fast & (dates > last_date)], 1)
+        for k in np.unique(shift[fast_rows]):
+            if k == 0:
+                continue
+            shifted = fast_rows[shift[fast_rows] == k]
+            self.closes[shifted, :-k] = self.closes[shifted, k:]
+            self.lows[shifted, :-k] = self.lows[shifted, k:]
+
+        fast_bar_rows = rows[fast]
+        from_end = (
+            pd.Series(fast_bar_rows).groupby(fast_bar_rows).cumcount(ascending=False)
+        )
+        columns = STATE_BARS - 1 - from_end.to_numpy()
+        self.closes[fast_bar_rows, columns] = bars["Close"].to_numpy()[fast]
+        self.lows[fast_bar_rows, columns] = bars["Low"].to_numpy()[fast]
+
+        fast_last = is_last & np.isin(rows, fast_rows)
+        self.last_date[rows[fast_last]] = dates[fast_last]
+        self.last_bar[rows[fast_last]] = values[fast_last]
+
+        return np.concatenate([fast_rows, rebuilt]).astype(int)
+
+    def _date(self, i):
+        """i번째 종목의 마지막 봉 날짜 문자열을 반환합니다."""
+        date = pd.Timestamp(self.last_date[i], tz="UTC")
+        if self.tz is not None:
+            date = date.tz_convert(self.tz)
+        return date.strftime("%Y-%m-%d")
+
+    def run_cycle(self):
+        """한 주기를 실행하고 발생한 전환 이벤트 목록을 반환합니다."""
+        tickers = list(self.index)
+        events = []
+        for i in range(0, len(tickers), POLL_BATCH):
+            batch = tickers[i : i + POLL_BATCH]
+            try:
+                rows = self._apply_batch(self._poll_latest(batch))
+                if not len(rows):
+                    continue
+                meets_criteria = self._evaluate(rows)
+            except Exception as e:
+                print(f"배치 갱신 중 오류 발생: {str(e)}")
+                continue
+
+            flipped = meets_criteria != self.status[rows]
+            self.status[rows] = meets_criteria
+            for row, met in zip(rows[flipped], meets_criteria[flipped]):
+                events.append(
+                    {
+                        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                        "ticker": self.index[row],
+                        "event": "enter" if met else "exit",
+                        "date": self._date(row),
+                        "close": float(self.closes[row, -1]),
+                    }
+                )
+
+        for event in events:
+            for sink in self.sinks:
+                sink.emit(event)
+        return events
+
+    def run(self, interval):
+        """interval초마다 주기를 반복합니다."""
+        self.bootstrap()
+        print(
+            f"{len(self.index)}개 종목 감시 시작 "
+            f"(조건 충족 {int(self.status.sum())}개)"
+        )
+        while True:
+            started = time.time()
+            for event in self.run_cycle():
+                print(f"[{event['event']}] {event['ticker']} {event['close']:.2f}")
+            time.sleep(max(0, interval - (time.time() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SEPA 조건 진입/이탈 감시")
+    parser.add_argument("tickers", nargs="*", help="감시할 티커 (기본: 중소형주 목록)")
+    parser.add_argument("--interval", type=int, default=300, help="확인 주기(초)")
+    parser.add_argument(
+        "--output", default="sepa_events.jsonl", help="이벤트를 기록할 파일"
+    )
+    parser.add_argument("--webhook", help="이벤트를 전송할 웹훅 URL")
+    args = parser.parse_args()
+
+    sinks = [FileSink(args.output)]
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+
+    tickers = args.tickers or get_us_midsmall_cap_stocks()
+    try:
+        SEPAWatcher(tickers, sinks).run(args.interval)
+    except KeyboardInterrupt:
+        print("감시 종료")
+
+
+if __name__ == "__main__":
+    main()